@@ -0,0 +1,11 @@
+"""Numba kernels for NitROS - imported lazily, only when a pointcloud is first quantized."""
+
+import numpy as np
+from numba import njit, prange
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def quantize_kernel(src, dst):
+    """Fused multiply + round + cast, split across cores (float32 math like the NumPy path)."""
+    for i in prange(src.size):
+        dst[i] = np.int16(np.rint(np.float32(src[i]) * np.float32(1000.0)))
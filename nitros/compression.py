@@ -1,6 +1,9 @@
-"""Compression module for NitROS - Image (JPEG) and pointcloud (quantization+LZ4) compression."""
+"""Compression module for NitROS - Image (JPEG) and pointcloud (quantization+LZ4/zstd) compression."""
 
-from typing import Any
+import importlib.util
+import struct
+import threading
+from typing import Any, Optional, Tuple
 
 # Optional imports
 try:
@@ -16,36 +19,183 @@ except ImportError:
     HAS_CV2 = False
 
 try:
-    import lz4.frame
+    from turbojpeg import TJPF_BGR, TJSAMP_420, TJSAMP_422, TJSAMP_444, TurboJPEG
+    _turbo = TurboJPEG()  # loads libturbojpeg once, reused for every frame
+    _TJ_SUBSAMPLING = {"420": TJSAMP_420, "422": TJSAMP_422, "444": TJSAMP_444}
+    HAS_TURBOJPEG = True
+except (ImportError, OSError, RuntimeError):
+    # RuntimeError/OSError: PyTurboJPEG installed but libturbojpeg not found
+    HAS_TURBOJPEG = False
+
+# numba is heavy to import, so only check it's there; the kernel module is
+# loaded on first use (see _load_quantize_kernel)
+HAS_NUMBA = importlib.util.find_spec("numba") is not None
+
+try:
+    import lz4.block
     HAS_LZ4 = True
 except ImportError:
     HAS_LZ4 = False
 
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+
+_quantize_kernel = None
+_quantize_kernel_lock = threading.Lock()
+
+
+def _load_quantize_kernel():
+    """Import numba and the quantize kernel on first use, or None if numba is unusable."""
+    global _quantize_kernel, HAS_NUMBA
+    with _quantize_kernel_lock:
+        if _quantize_kernel is None and HAS_NUMBA:
+            try:
+                from ._numba_kernels import quantize_kernel
+                _quantize_kernel = quantize_kernel
+            except ImportError:
+                HAS_NUMBA = False
+    return _quantize_kernel
+
+
+# Input dtypes the numba kernel is compiled for (all warmed up front); any
+# other dtype takes the NumPy path rather than JIT-compiling on a send
+_KERNEL_DTYPES = ("float32", "float64")
+
+
+def _warmup_quantizer():
+    """Compile the numba quantizer for every kernel dtype ahead of the first real pointcloud."""
+    if HAS_NUMBA:
+        for dtype in _KERNEL_DTYPES:
+            _quantize(np.zeros(4, dtype=dtype), np.empty(4, dtype=np.int16))
+
+
+# Per-thread scratch arrays reused across compress() calls (each publisher
+# compresses on its own send thread, so buffers are never shared)
+_scratch = threading.local()
+
+
+def _workspace(name: str, shape, dtype) -> "np.ndarray":
+    """Return a reusable scratch array of `shape`, growing it if needed."""
+    size = int(np.prod(shape))
+    buf = getattr(_scratch, name, None)
+    if buf is None or buf.size < size:
+        buf = np.empty(size, dtype=dtype)
+        setattr(_scratch, name, buf)
+    return buf[:size].reshape(shape)
+
+
+def _zstd_compressor() -> "zstandard.ZstdCompressor":
+    """Per-thread zstd level 1 compressor (contexts are not thread-safe)."""
+    cctx = getattr(_scratch, "zstd_c", None)
+    if cctx is None:
+        cctx = zstandard.ZstdCompressor(level=1, threads=-1)
+        _scratch.zstd_c = cctx
+    return cctx
+
+
+def _zstd_decompressor() -> "zstandard.ZstdDecompressor":
+    """Per-thread zstd decompressor."""
+    dctx = getattr(_scratch, "zstd_d", None)
+    if dctx is None:
+        dctx = zstandard.ZstdDecompressor()
+        _scratch.zstd_d = dctx
+    return dctx
+
+
+def _quantize(data: "np.ndarray", out: "np.ndarray") -> "np.ndarray":
+    """Quantize meters into `out` as int16 millimeters, rounding to nearest."""
+    kernel = None
+    if data.dtype.name in _KERNEL_DTYPES:
+        kernel = _quantize_kernel or _load_quantize_kernel()
+    if kernel is not None:
+        # Single pass over memory, no float temporary
+        src = np.ascontiguousarray(data)
+        kernel(src.reshape(-1), out.reshape(-1))
+        return out
+
+    # One float32 scratch pass (multiply + round in place), then cast into int16
+    scratch = _workspace("float32", data.shape, np.float32)
+    np.multiply(data, 1000, out=scratch, dtype=np.float32)
+    np.rint(scratch, out=scratch)
+    np.copyto(out, scratch, casting='unsafe')
+    return out
+
+
+JPEG_SUBSAMPLING = ("420", "422", "444")
 
-def compress(data: Any, mode: str) -> bytes:
+# Pointcloud payload kind (first header byte): how the int16/uint16 body maps back
+_PC_QUANTIZED = 0   # float meters quantized to int16 mm, decoded back to float32 meters
+_PC_RAW_INT16 = 1   # int16 input sent as-is
+_PC_RAW_UINT16 = 2  # uint16 input sent as-is
+_MM_TO_M = np.float32(0.001) if HAS_NUMPY else None
+_PC_DTYPES = {_PC_QUANTIZED: "int16", _PC_RAW_INT16: "int16", _PC_RAW_UINT16: "uint16"}
+
+
+def compress(data: Any, mode: str, quality: int = 80, subsampling: str = "420") -> bytes:
     """
     Compress data based on compression mode.
 
     Args:
-        data: Data to compress (numpy array for image/pointcloud)
-        mode: Compression mode ("image" or "pointcloud")
+        data: Data to compress (numpy array for image/pointcloud). Pointclouds
+            in int16/uint16 are taken as already quantized and sent unscaled.
+        mode: Compression mode ("image", "pointcloud" or "pointcloud_zstd")
+        quality: JPEG quality 1-100 (image only)
+        subsampling: JPEG chroma subsampling, "420", "422" or "444" (image only)
 
     Returns:
         Compressed bytes
     """
+    return b"".join(compress_chunks(data, mode, quality=quality, subsampling=subsampling))
+
+
+def compress_chunks(
+    data: Any, mode: str, quality: int = 80, subsampling: str = "420"
+) -> Tuple[bytes, ...]:
+    """
+    Compress data into byte chunks meant to be sent back to back.
+
+    Same as compress(), but the pointcloud header and compressed body are
+    returned separately so the body is never copied into a joined buffer.
+
+    Returns:
+        Tuple of compressed byte chunks
+    """
     if mode == "image":
+        if subsampling not in JPEG_SUBSAMPLING:
+            raise ValueError(f"Unknown JPEG subsampling: {subsampling}")
+
+        if HAS_TURBOJPEG:
+            # libturbojpeg SIMD encoder, needs a contiguous BGR buffer
+            return (_turbo.encode(
+                np.ascontiguousarray(data),
+                quality=quality,
+                pixel_format=TJPF_BGR,
+                jpeg_subsample=_TJ_SUBSAMPLING[subsampling],
+            ),)
+
         if not HAS_CV2:
-            raise ImportError("opencv-python is required for image compression")
+            raise ImportError("PyTurboJPEG or opencv-python is required for image compression")
+
+        params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+        # Sampling factor flag only exists in OpenCV >= 4.5.5 (its default is 4:2:0)
+        sampling = getattr(cv2, f"IMWRITE_JPEG_SAMPLING_FACTOR_{subsampling}", None)
+        if sampling is not None:
+            params += [cv2.IMWRITE_JPEG_SAMPLING_FACTOR, sampling]
 
-        # JPEG compression with quality 80
-        success, encoded = cv2.imencode('.jpg', data, [cv2.IMWRITE_JPEG_QUALITY, 80])
+        success, encoded = cv2.imencode('.jpg', data, params)
         if not success:
             raise ValueError("Failed to encode image")
-        return encoded.tobytes()
+        return (encoded.tobytes(),)
 
-    elif mode == "pointcloud":
-        if not HAS_LZ4:
+    elif mode in ("pointcloud", "pointcloud_zstd"):
+        if mode == "pointcloud" and not HAS_LZ4:
             raise ImportError("lz4 is required for pointcloud compression")
+        if mode == "pointcloud_zstd" and not HAS_ZSTD:
+            raise ImportError("zstandard is required for pointcloud_zstd compression")
         if not HAS_NUMPY:
             raise ImportError("numpy is required for pointcloud compression")
 
@@ -53,17 +203,29 @@ def compress(data: Any, mode: str) -> bytes:
         if not isinstance(data, np.ndarray):
             data = np.array(data)
 
-        # Quantize to 1mm (assuming meters input) and convert to int16
-        quantized = (data * 1000).astype(np.int16)
+        # 16-bit integer clouds are already quantized (e.g. native mm LiDAR
+        # output): send as-is. Anything else is meters, quantized to 1mm int16.
+        if data.dtype == np.int16:
+            kind, quantized = _PC_RAW_INT16, np.ascontiguousarray(data)
+        elif data.dtype == np.uint16:
+            kind, quantized = _PC_RAW_UINT16, np.ascontiguousarray(data)
+        else:
+            kind = _PC_QUANTIZED
+            quantized = _quantize(data, _workspace("int16", data.shape, np.int16))
 
-        # Store shape for reconstruction
-        shape_bytes = np.array(quantized.shape, dtype=np.int32).tobytes()
+        # Header: [kind][ndim][ndim x int32 dims], built in one call
+        ndim = quantized.ndim
+        header = struct.pack(f'!BB{ndim}i', kind, ndim, *quantized.shape)
 
-        # LZ4 compression
-        compressed = lz4.frame.compress(quantized.tobytes())
+        # Compress straight from the array buffer (no tobytes() copy)
+        if mode == "pointcloud":
+            # LZ4 block: no frame/checksum overhead, size comes from shape
+            compressed = lz4.block.compress(quantized, mode='fast', store_size=False)
+        else:
+            # zstd level 1: better ratio than LZ4 at similar speed
+            compressed = _zstd_compressor().compress(quantized)
 
-        # Combine shape + compressed data
-        return len(shape_bytes).to_bytes(4, 'big') + shape_bytes + compressed
+        return header, compressed
 
     else:
         raise ValueError(f"Unknown compression mode: {mode}")
@@ -75,42 +237,105 @@ def decompress(data: bytes, mode: str) -> Any:
 
     Args:
         data: Compressed bytes
-        mode: Compression mode ("image" or "pointcloud")
+        mode: Compression mode ("image", "pointcloud" or "pointcloud_zstd")
 
     Returns:
         Decompressed data (numpy array)
     """
+    return decompress_into(data, mode)
+
+
+def decompress_into(data: bytes, mode: str, out: Optional["np.ndarray"] = None) -> Any:
+    """
+    Decompress data, writing the result into a caller-provided array.
+
+    Lets hot subscribers reuse the same output buffer frame after frame
+    instead of allocating a new one per message. If `out` is None or its
+    shape/dtype doesn't match the decoded data, a new array is allocated.
+
+    Args:
+        data: Compressed bytes
+        mode: Compression mode ("image", "pointcloud" or "pointcloud_zstd")
+        out: Optional destination array (uint8 HxWx3 for image, float32 for
+            pointcloud, or the sent dtype for int16/uint16 pointclouds)
+
+    Returns:
+        Decompressed data (`out` when it was used, otherwise a new array)
+    """
     if mode == "image":
+        if HAS_TURBOJPEG:
+            if out is not None:
+                width, height, _, _ = _turbo.decode_header(data)
+                if not _fits(out, (height, width, 3), np.uint8):
+                    out = None
+            # Decodes directly into `out` when given
+            return _turbo.decode(data, pixel_format=TJPF_BGR, dst=out)
+
         if not HAS_CV2:
-            raise ImportError("opencv-python is required for image decompression")
+            raise ImportError("PyTurboJPEG or opencv-python is required for image decompression")
 
         # Decode JPEG
         nparr = np.frombuffer(data, np.uint8)
         img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
         if img is None:
             raise ValueError("Failed to decode image")
+        # cv2.imdecode has no destination argument, so copy into `out`
+        if out is not None and _fits(out, img.shape, img.dtype):
+            np.copyto(out, img)
+            return out
         return img
 
-    elif mode == "pointcloud":
-        if not HAS_LZ4:
+    elif mode in ("pointcloud", "pointcloud_zstd"):
+        if mode == "pointcloud" and not HAS_LZ4:
             raise ImportError("lz4 is required for pointcloud decompression")
+        if mode == "pointcloud_zstd" and not HAS_ZSTD:
+            raise ImportError("zstandard is required for pointcloud_zstd decompression")
         if not HAS_NUMPY:
             raise ImportError("numpy is required for pointcloud decompression")
 
-        # Extract shape
-        shape_len = int.from_bytes(data[:4], 'big')
-        shape_bytes = data[4:4+shape_len]
-        shape = np.frombuffer(shape_bytes, dtype=np.int32)
+        # Extract kind + shape
+        kind, ndim = data[0], data[1]
+        shape = struct.unpack_from(f'!{ndim}i', data, 2)
+        dtype = np.dtype(_PC_DTYPES[kind])
 
-        # Decompress LZ4
-        compressed_data = data[4+shape_len:]
-        decompressed = lz4.frame.decompress(compressed_data)
+        # Decompress straight into a buffer of the known output size
+        compressed_data = memoryview(data)[2 + 4 * ndim:]
+        raw_size = int(np.prod(shape)) * dtype.itemsize
+        if mode == "pointcloud":
+            decompressed = lz4.block.decompress(
+                compressed_data, uncompressed_size=raw_size, return_bytearray=True
+            )
+        else:
+            decompressed = _zstd_decompressor().decompress(
+                compressed_data, max_output_size=raw_size
+            )
 
-        # Reconstruct array
-        quantized = np.frombuffer(decompressed, dtype=np.int16).reshape(shape)
+        # Reconstruct array (view over the decompressed buffer, no copy)
+        quantized = np.frombuffer(decompressed, dtype=dtype).reshape(shape)
 
-        # Dequantize back to meters
-        return quantized.astype(np.float32) / 1000.0
+        # Raw integer clouds come back exactly as they were sent
+        if kind != _PC_QUANTIZED:
+            if out is not None and _fits(out, shape, dtype):
+                np.copyto(out, quantized)
+                return out
+            # zstd returns immutable bytes; copy so the result is writable
+            return quantized if quantized.flags.writeable else quantized.copy()
+
+        # Dequantize back to meters: one fused int16 -> float32 multiply pass
+        if out is None or not _fits(out, shape, np.float32):
+            out = np.empty(shape, dtype=np.float32)
+        np.multiply(quantized, _MM_TO_M, out=out)
+        return out
 
     else:
         raise ValueError(f"Unknown compression mode: {mode}")
+
+
+def _fits(out: "np.ndarray", shape, dtype) -> bool:
+    """Whether `out` can be written in place as an array of `shape` and `dtype`."""
+    return (
+        out.shape == tuple(shape)
+        and out.dtype == dtype
+        and out.flags.c_contiguous
+        and out.flags.writeable
+    )
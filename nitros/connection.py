@@ -26,6 +26,7 @@ class ConnectionManager:
         self.client: Optional[TCPClient] = None
         self._running = False
         self._connect_task: Optional[asyncio.Task] = None
+        self._disconnected: Optional[asyncio.Event] = None
 
         # Exponential backoff parameters
         self.min_backoff = 1.0  # seconds
@@ -35,6 +36,8 @@ class ConnectionManager:
     async def start(self):
         """Start connection with automatic reconnection."""
         self._running = True
+        # Created here so it belongs to the running loop (__init__ runs on the discovery thread)
+        self._disconnected = asyncio.Event()
         self._connect_task = asyncio.create_task(self._connect_loop())
 
     async def _connect_loop(self):
@@ -44,6 +47,8 @@ class ConnectionManager:
                 # Create new client
                 self.client = TCPClient(self.host, self.port)
                 self.client.on_message(self.on_message)
+                self.client.on_disconnect(self._disconnected.set)
+                self._disconnected.clear()
 
                 # Attempt connection
                 await self.client.connect()
@@ -51,9 +56,8 @@ class ConnectionManager:
                 # Reset backoff on successful connection
                 self.current_backoff = self.min_backoff
 
-                # Wait for disconnection
-                while self._running and self.client._running:
-                    await asyncio.sleep(0.1)
+                # Wait for disconnection (client signals when its receive loop ends)
+                await self._disconnected.wait()
 
                 # Connection lost
                 if self._running:
@@ -1,5 +1,6 @@
 """Discovery module for NitROS - mDNS service registration and browsing."""
 
+import functools
 import socket
 import threading
 import time
@@ -16,6 +17,56 @@ except ImportError:
 
 SERVICE_TYPE = "_nitros._tcp.local."
 
+# One Zeroconf instance (multicast sockets + worker threads) shared by every
+# DiscoveryService in the process, closed when the last user releases it
+_zc_shared: Optional["Zeroconf"] = None
+_zc_refcount = 0
+_zc_lock = threading.Lock()
+
+
+def _acquire_zeroconf() -> "Zeroconf":
+    """Get the process-wide Zeroconf instance, creating it on first use."""
+    global _zc_shared, _zc_refcount
+    with _zc_lock:
+        if _zc_shared is None:
+            _zc_shared = Zeroconf()
+        _zc_refcount += 1
+        return _zc_shared
+
+
+def _release_zeroconf() -> None:
+    """Drop one reference to the shared Zeroconf, closing it on the last one."""
+    global _zc_shared, _zc_refcount
+    with _zc_lock:
+        _zc_refcount -= 1
+        if _zc_refcount > 0:
+            return
+        zc, _zc_shared = _zc_shared, None
+    if zc is not None:
+        zc.close()
+
+
+@functools.lru_cache(maxsize=1)
+def _local_ipv4() -> str:
+    """Best non-loopback IPv4 address of this host (resolved once per process)."""
+    try:
+        infos = socket.getaddrinfo(socket.gethostname(), None, socket.AF_INET)
+    except OSError:
+        infos = []
+    for info in infos:
+        ip = info[4][0]
+        if not ip.startswith("127."):
+            return ip
+
+    # Hostname maps to loopback (common /etc/hosts setup): ask the routing
+    # table which interface would be used. UDP connect sends no packets.
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.connect(("10.255.255.255", 1))
+            return s.getsockname()[0]
+    except OSError:
+        return "127.0.0.1"
+
 
 class DiscoveryService:
     """mDNS service registration and discovery."""
@@ -25,7 +76,7 @@ class DiscoveryService:
         if not HAS_ZEROCONF:
             raise ImportError("zeroconf is required for service discovery")
 
-        self.zeroconf = Zeroconf()
+        self.zeroconf: Optional[Zeroconf] = _acquire_zeroconf()
         self.service_info: Optional[ServiceInfo] = None
         self.browser: Optional[ServiceBrowser] = None
 
@@ -36,11 +87,8 @@ class DiscoveryService:
         Args:
             topic: Topic name
             port: TCP port the publisher is listening on
+            compression: Compression mode advertised to subscribers
         """
-        # Get local IP
-        hostname = socket.gethostname()
-        local_ip = socket.gethostbyname(hostname)
-
         # Create unique service name from topic + instance ID
         instance_id = uuid.uuid4().hex[:8]
         service_name = f"{topic}-{instance_id}.{SERVICE_TYPE}"
@@ -49,9 +97,9 @@ class DiscoveryService:
         self.service_info = ServiceInfo(
             SERVICE_TYPE,
             service_name,
-            addresses=[socket.inet_aton(local_ip)],
+            addresses=[socket.inet_aton(_local_ipv4())],
             port=port,
-            properties={"topic": topic, "compression": compression},
+            properties={b"topic": topic.encode("utf-8"), b"compression": compression.encode("utf-8")},
         )
 
         # Register
@@ -118,12 +166,19 @@ class DiscoveryService:
 
     def close(self) -> None:
         """Close the discovery service."""
+        if self.zeroconf is None:
+            return
+
         if self.browser:
             self.browser.cancel()
+            self.browser = None
 
-        # zeroconf.close() handles unregistration internally
-        self.zeroconf.close()
+        # The Zeroconf instance may outlive us, so unregister explicitly
+        self.unregister_service()
         self.service_info = None
+
+        self.zeroconf = None
+        _release_zeroconf()
         _log("Discovery service closed")
 
 
@@ -143,7 +198,7 @@ def list_all_services(timeout: float = 2.0) -> Dict[str, List[dict]]:
     results: Dict[str, List[dict]] = {}
     lock = threading.Lock()
 
-    zc = Zeroconf()
+    zc = _acquire_zeroconf()
 
     class Listener:
         def add_service(self, zc, service_type, name):
@@ -170,5 +225,5 @@ def list_all_services(timeout: float = 2.0) -> Dict[str, List[dict]]:
     browser = ServiceBrowser(zc, SERVICE_TYPE, Listener())
     time.sleep(timeout)
     browser.cancel()
-    zc.close()
+    _release_zeroconf()
     return results
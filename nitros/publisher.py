@@ -1,39 +1,102 @@
 """Publisher module for NitROS - User-facing Publisher class."""
 
 import asyncio
-import queue
+import collections
 import threading
-from typing import Any, Optional
+from typing import Any, Callable, Optional, Tuple
 
-from .compression import compress
+from .compression import _warmup_quantizer, compress_chunks
 from .discovery import DiscoveryService
 from .logger import _log, _enabled
-from .serializer import serialize
-from .transport import TCPServer
+from .serializer import serialize_chunks
+from .transport import TCPServer, _new_event_loop
 
 import nitros.logger as _logger
 
+# Leading flags byte of every payload (low 2 bits = compression mode)
+_FLAGS_RAW = bytes([0])
+_FLAGS_IMAGE = bytes([1])
+_FLAGS_POINTCLOUD = bytes([2])
+_FLAGS_POINTCLOUD_ZSTD = bytes([3])
+
+# (data, type_hint) -> payload chunks, picked once per publisher
+Encoder = Callable[[Any, Optional[str]], Tuple[bytes, ...]]
+
+
+def _make_raw_encoder() -> Encoder:
+    """Encoder for uncompressed topics (msgpack / framed ndarray)."""
+    def encode(data: Any, type_hint: Optional[str]) -> Tuple[bytes, ...]:
+        return (_FLAGS_RAW, *serialize_chunks(data, type_hint=type_hint))
+    return encode
+
+
+def _make_image_encoder(quality: int, subsampling: str) -> Encoder:
+    """Encoder for JPEG image topics."""
+    def encode(data: Any, type_hint: Optional[str]) -> Tuple[bytes, ...]:
+        return (_FLAGS_IMAGE, *compress_chunks(data, "image", quality=quality, subsampling=subsampling))
+    return encode
+
+
+def _make_pointcloud_encoder(mode: str, flags: bytes) -> Encoder:
+    """Encoder for quantized + LZ4/zstd pointcloud topics."""
+    def encode(data: Any, type_hint: Optional[str]) -> Tuple[bytes, ...]:
+        return (flags, *compress_chunks(data, mode))
+    return encode
+
+
+def _make_encoder(compression: Optional[str], quality: int, subsampling: str) -> Encoder:
+    """Pick the encoder for a publisher configuration."""
+    if not compression:
+        return _make_raw_encoder()
+    if compression == "image":
+        return _make_image_encoder(quality, subsampling)
+    if compression == "pointcloud":
+        return _make_pointcloud_encoder("pointcloud", _FLAGS_POINTCLOUD)
+    if compression == "pointcloud_zstd":
+        return _make_pointcloud_encoder("pointcloud_zstd", _FLAGS_POINTCLOUD_ZSTD)
+    raise ValueError(f"Unknown compression mode: {compression}")
+
 
 class Publisher:
     """Publisher for sending messages to subscribers on a topic."""
 
-    def __init__(self, topic: str, compression: Optional[str] = None, log: bool = False):
+    def __init__(
+        self,
+        topic: str,
+        compression: Optional[str] = None,
+        log: bool = False,
+        quality: int = 80,
+        subsampling: str = "420",
+        low_latency: bool = False,
+    ):
         """
         Initialize publisher.
 
         Args:
             topic: Topic name to publish on
-            compression: Optional compression mode ("image" or "pointcloud")
+            compression: Optional compression mode ("image", "pointcloud" or "pointcloud_zstd")
             log: Enable print-based logging
+            quality: JPEG quality 1-100 (compression="image" only)
+            subsampling: JPEG chroma subsampling "420", "422" or "444" (compression="image" only)
+            low_latency: Tune sockets for small high-rate messages (IMU, joint states):
+                cap the kernel send buffer at 1MB instead of letting it
+                autotune, so less data queues up ahead of the newest message
         """
         _logger._enabled = _logger._enabled or log
 
         self.topic = topic
         self.compression = compression
+        self.quality = quality
+        self.subsampling = subsampling
+        self.low_latency = low_latency
+
+        # Per-message encode path, specialized once for this configuration
+        self._encode = _make_encoder(compression, quality, subsampling)
 
         # Create event loop for asyncio in background thread
         self._loop: Optional[asyncio.AbstractEventLoop] = None
         self._loop_thread: Optional[threading.Thread] = None
+        self._loop_ready = threading.Event()
 
         # TCP server
         self.server: Optional[TCPServer] = None
@@ -42,9 +105,15 @@ class Publisher:
         # Discovery service
         self.discovery: Optional[DiscoveryService] = None
 
-        # Send queue (bounded to avoid memory issues)
-        self._send_queue: queue.Queue = queue.Queue(maxsize=10)
+        # Send queue (bounded to avoid memory issues; appending to a full
+        # deque drops the oldest entry atomically, no lock needed)
+        self._send_queue: collections.deque = collections.deque(maxlen=10)
+        self._send_event = threading.Event()
         self._send_thread: Optional[threading.Thread] = None
+
+        # Encoded messages waiting to be broadcast, drained by a task on the loop
+        self._broadcast_queue: Optional[asyncio.Queue] = None
+        self._pump_task: Optional[asyncio.Task] = None
         self._running = False
 
         # Start everything
@@ -57,8 +126,7 @@ class Publisher:
         self._loop_thread.start()
 
         # Wait for loop to be ready
-        while self._loop is None:
-            pass
+        self._loop_ready.wait()
 
         # Start TCP server
         future = asyncio.run_coroutine_threadsafe(self._start_server(), self._loop)
@@ -71,6 +139,10 @@ class Publisher:
         except ImportError:
             _log("zeroconf not available, discovery disabled")
 
+        # Compile the pointcloud quantizer now rather than on the first send
+        if self.compression in ("pointcloud", "pointcloud_zstd"):
+            _warmup_quantizer()
+
         # Start send thread
         self._running = True
         self._send_thread = threading.Thread(target=self._send_worker, daemon=True)
@@ -80,51 +152,78 @@ class Publisher:
 
     def _run_event_loop(self):
         """Run asyncio event loop in background thread."""
-        self._loop = asyncio.new_event_loop()
+        self._loop = _new_event_loop()
         asyncio.set_event_loop(self._loop)
+        self._loop_ready.set()
         self._loop.run_forever()
 
     async def _start_server(self) -> int:
-        """Start TCP server."""
-        self.server = TCPServer(port=0)  # Random available port
+        """Start TCP server and the broadcast pump."""
+        # Random available port
+        if self.low_latency:
+            self.server = TCPServer(port=0, sndbuf=1 << 20)
+        else:
+            self.server = TCPServer(port=0)
         port = await self.server.start()
+
+        self._broadcast_queue = asyncio.Queue(maxsize=10)
+        self._pump_task = asyncio.create_task(self._pump())
         return port
 
+    async def _stop_server(self):
+        """Stop the broadcast pump and TCP server."""
+        if self._pump_task:
+            self._pump_task.cancel()
+            try:
+                await self._pump_task
+            except asyncio.CancelledError:
+                pass
+
+        await self.server.stop()
+
+    def _enqueue_broadcast(self, chunks):
+        """Queue an encoded message for the pump (runs on the event loop)."""
+        if self._broadcast_queue.full():
+            # Network can't keep up, drop oldest
+            self._broadcast_queue.get_nowait()
+            _log("Broadcast queue full, dropped oldest message")
+        self._broadcast_queue.put_nowait(chunks)
+
+    async def _pump(self):
+        """Drain the broadcast queue, coalescing whatever is ready into one batch."""
+        while True:
+            batch = [await self._broadcast_queue.get()]
+            while not self._broadcast_queue.empty():
+                batch.append(self._broadcast_queue.get_nowait())
+            try:
+                await self.server.broadcast_many(batch)
+            except Exception as e:
+                _log(f"Failed to broadcast: {e}")
+
     def _send_worker(self):
         """Background worker that processes send queue."""
         while self._running:
-            try:
-                # Get data from queue with timeout
-                data = self._send_queue.get(timeout=0.1)
+            self._send_event.wait()
+            self._send_event.clear()
+
+            # Drain everything queued since the last wakeup
+            while self._send_queue:
+                try:
+                    item = self._send_queue.popleft()  # (data, type_hint)
+                except IndexError:
+                    break
 
                 # Process and send
                 try:
-                    # Extract type_hint if present
-                    type_hint = None
-                    if isinstance(data, tuple) and len(data) == 2 and isinstance(data[1], str):
-                        data, type_hint = data
-
-                    # Compress if needed
-                    if self.compression:
-                        data = compress(data, self.compression)
-                        flags = 1 if self.compression == "image" else 2
-                        payload = bytes([flags]) + data
-                    else:
-                        serialized = serialize(data, type_hint=type_hint)
-                        payload = bytes([0]) + serialized
-
-                    # Broadcast to all clients (fire-and-forget)
-                    asyncio.run_coroutine_threadsafe(
-                        self.server.broadcast(payload),
-                        self._loop
-                    )
+                    # Flags byte and body go out as separate chunks
+                    chunks = self._encode(*item)
+
+                    # Hand off to the pump on the loop (fire-and-forget)
+                    self._loop.call_soon_threadsafe(self._enqueue_broadcast, chunks)
 
                 except Exception as e:
                     _log(f"Failed to send message: {e}")
 
-            except queue.Empty:
-                continue
-
     @property
     def subscriber_count(self) -> int:
         """Number of currently connected subscribers."""
@@ -159,19 +258,11 @@ class Publisher:
             data: Data to send (dict, list, numpy array, etc.)
             type_hint: Optional type name to include in metadata
         """
-        if type_hint:
-            data = (data, type_hint)
-        try:
-            # Try to put on queue without blocking
-            self._send_queue.put_nowait(data)
-        except queue.Full:
-            # Queue full, drop oldest and add new
-            try:
-                self._send_queue.get_nowait()
-                self._send_queue.put_nowait(data)
-                _log("Send queue full, dropped oldest message")
-            except:
-                pass
+        if len(self._send_queue) == self._send_queue.maxlen:
+            _log("Send queue full, dropped oldest message")
+        self._send_queue.append((data, type_hint))  # drops oldest when full
+        if not self._send_event.is_set():
+            self._send_event.set()
 
     def close(self):
         """Close publisher and cleanup resources."""
@@ -180,12 +271,13 @@ class Publisher:
         self._running = False
 
         # Stop send thread
+        self._send_event.set()
         if self._send_thread:
             self._send_thread.join(timeout=1.0)
 
-        # Stop TCP server
+        # Stop broadcast pump and TCP server
         if self.server and self._loop:
-            future = asyncio.run_coroutine_threadsafe(self.server.stop(), self._loop)
+            future = asyncio.run_coroutine_threadsafe(self._stop_server(), self._loop)
             try:
                 future.result(timeout=1.0)
             except:
@@ -1,7 +1,19 @@
 """Serializer module for NitROS - MessagePack-based data serialization with type detection."""
 
+import functools
+import struct
+import warnings
+from typing import Any, Optional, Tuple
+
 import msgpack
-from typing import Any, Optional
+
+# msgpack silently falls back to a pure-Python implementation (no wheel for
+# this platform, or MSGPACK_PUREPYTHON set), which is several times slower
+if msgpack.Unpacker.__module__ != "msgpack._cmsgpack":
+    warnings.warn(
+        "msgpack C extension not available, using the slow pure-Python fallback",
+        RuntimeWarning,
+    )
 
 # Optional imports
 try:
@@ -16,11 +28,117 @@ try:
 except ImportError:
     HAS_TORCH = False
 
+# Raw ndarray framing: [magic][dtype code][ndim][8 x int32 dims][array bytes]
+_NDARRAY_MAGIC = b"NDA1"
+_NDHDR = struct.Struct("!4sBB8i")
+_NDARRAY_MAX_DIMS = 8
+
+# MessagePack extension type for arrays nested inside dicts/lists
+_NDARRAY_EXT_CODE = 0x1D
+
+# Dtype code = index into this table (native byte order)
+_DTYPE_NAMES = (
+    "bool", "uint8", "int8", "uint16", "int16", "uint32", "int32",
+    "uint64", "int64", "float16", "float32", "float64", "complex64", "complex128",
+)
+if HAS_NUMPY:
+    _DTYPES = tuple(np.dtype(name) for name in _DTYPE_NAMES)
+    _DTYPE_CODES = {dtype: code for code, dtype in enumerate(_DTYPES)}
+
+
+def _serialize_ndarray(arr: "np.ndarray") -> Optional[Tuple[bytes, bytes]]:
+    """Frame an ndarray as (header, raw bytes), or None if it can't be framed."""
+    code = _DTYPE_CODES.get(arr.dtype)
+    if code is None or arr.ndim > _NDARRAY_MAX_DIMS:
+        return None
+    dims = list(arr.shape) + [0] * (_NDARRAY_MAX_DIMS - arr.ndim)
+    header = _NDHDR.pack(_NDARRAY_MAGIC, code, arr.ndim, *dims)
+    return header, arr.tobytes()
+
+
+def _as_result(arr: "np.ndarray", readonly: bool) -> "np.ndarray":
+    """
+    Return a view over the received buffer where possible.
+
+    Views over writable buffers (bytearray, writable memoryview) come back
+    as-is. Views over immutable bytes are read-only, so they are copied
+    unless the caller asked for read-only results.
+
+    Views whose data isn't aligned to the dtype's alignment (e.g. 8 bytes
+    for float64) are always copied: on the wire the body follows the flags
+    byte and the 38-byte header, so it usually starts at an odd offset, and
+    unaligned arrays are far slower to compute on than one memcpy.
+    """
+    if arr.flags.aligned and (readonly or arr.flags.writeable):
+        return arr
+    return arr.copy()
+
+
+def _deserialize_ndarray(data, readonly: bool = False) -> "np.ndarray":
+    """Rebuild an ndarray from a buffer framed by _serialize_ndarray()."""
+    _, code, ndim, *dims = _NDHDR.unpack_from(data)
+    arr = np.frombuffer(data, dtype=_DTYPES[code], offset=_NDHDR.size)
+    return _as_result(arr.reshape(dims[:ndim]), readonly)
+
+
+def _msgpack_default(obj: Any) -> Any:
+    """msgpack default hook: encode nested arrays/tensors as an ExtType."""
+    if HAS_TORCH and isinstance(obj, torch.Tensor):
+        obj = obj.cpu().numpy()
+    if HAS_NUMPY and isinstance(obj, np.ndarray):
+        framed = _serialize_ndarray(obj)
+        if framed is not None:
+            return msgpack.ExtType(_NDARRAY_EXT_CODE, b"".join(framed))
+    raise TypeError(f"Cannot serialize object of type {type(obj).__name__}")
+
+
+def _msgpack_ext_hook(code: int, data: bytes, readonly: bool = False) -> Any:
+    """msgpack ext hook: decode arrays encoded by _msgpack_default()."""
+    if code == _NDARRAY_EXT_CODE and HAS_NUMPY:
+        return _deserialize_ndarray(data, readonly)
+    return msgpack.ExtType(code, data)
+
+
+_EXT_HOOKS = {
+    False: _msgpack_ext_hook,
+    True: functools.partial(_msgpack_ext_hook, readonly=True),
+}
+
+
+def serialize_chunks(data: Any, type_hint: Optional[str] = None) -> Tuple[bytes, ...]:
+    """
+    Serialize data into one or more byte chunks meant to be sent back to back.
+
+    Numpy arrays (and torch tensors) are framed as a small fixed header plus
+    the raw array bytes, so the array buffer is never copied into a msgpack
+    document. Everything else is a single MessagePack chunk.
+
+    Args:
+        data: Data to serialize (dict, list, numpy array, torch tensor, or primitives)
+        type_hint: Optional type name to include in metadata
+
+    Returns:
+        Tuple of byte chunks
+    """
+    # Torch tensor → same path via numpy
+    if HAS_TORCH and isinstance(data, torch.Tensor):
+        data = data.cpu().numpy()
+
+    if HAS_NUMPY and isinstance(data, np.ndarray):
+        framed = _serialize_ndarray(data)
+        if framed is not None:
+            return framed
+
+    return (serialize(data, type_hint=type_hint),)
+
 
 def serialize(data: Any, type_hint: Optional[str] = None) -> bytes:
     """
     Serialize data using MessagePack with automatic type detection.
 
+    Numpy arrays and torch tensors nested inside dicts or lists are
+    encoded as a MessagePack extension type carrying the raw array bytes.
+
     Args:
         data: Data to serialize (dict, list, numpy array, torch tensor, or primitives)
         type_hint: Optional type name to include in metadata
@@ -28,8 +146,15 @@ def serialize(data: Any, type_hint: Optional[str] = None) -> bytes:
     Returns:
         Serialized bytes
     """
-    # Numpy array → raw bytes + metadata
+    # Torch tensor → same path via numpy
+    if HAS_TORCH and isinstance(data, torch.Tensor):
+        data = data.cpu().numpy()
+
+    # Numpy array → framed raw bytes, or a metadata wrapper for exotic dtypes
     if HAS_NUMPY and isinstance(data, np.ndarray):
+        framed = _serialize_ndarray(data)
+        if framed is not None:
+            return b"".join(framed)
         wrapper = {
             "__ndarray": True,
             "dtype": str(data.dtype),
@@ -40,19 +165,6 @@ def serialize(data: Any, type_hint: Optional[str] = None) -> bytes:
             wrapper["__type"] = type_hint
         return msgpack.packb(wrapper, use_bin_type=True)
 
-    # Torch tensor → same path via numpy
-    if HAS_TORCH and isinstance(data, torch.Tensor):
-        arr = data.cpu().numpy()
-        wrapper = {
-            "__ndarray": True,
-            "dtype": str(arr.dtype),
-            "shape": list(arr.shape),
-            "data": arr.tobytes(),
-        }
-        if type_hint:
-            wrapper["__type"] = type_hint
-        return msgpack.packb(wrapper, use_bin_type=True)
-
     # Add type hint if provided
     if type_hint:
         if isinstance(data, dict):
@@ -60,26 +172,39 @@ def serialize(data: Any, type_hint: Optional[str] = None) -> bytes:
         else:
             data = {"__type": type_hint, "data": data}
 
-    return msgpack.packb(data, use_bin_type=True)
+    return msgpack.packb(data, use_bin_type=True, default=_msgpack_default)
 
 
-def deserialize(data: bytes) -> Any:
+def deserialize(data: bytes, readonly: bool = False) -> Any:
     """
-    Deserialize MessagePack bytes back to Python objects.
+    Deserialize bytes produced by serialize() back to Python objects.
+
+    Numpy arrays are returned as views over `data` without copying when
+    `data` is writable (e.g. a bytearray). For immutable bytes they are
+    copied so the result stays writable, unless `readonly` is set.
 
     Args:
-        data: Serialized bytes
+        data: Serialized bytes (any buffer-protocol object)
+        readonly: Allow read-only array views instead of copying
 
     Returns:
         Deserialized Python object
     """
-    result = msgpack.unpackb(data, raw=False)
+    # Framed ndarray. The magic's first byte is a one-byte MessagePack fixint,
+    # so no valid multi-byte MessagePack document can start with it.
+    if HAS_NUMPY and len(data) >= _NDHDR.size and data[:4] == _NDARRAY_MAGIC:
+        return _deserialize_ndarray(data, readonly)
+
+    # strict_map_key=False: dicts with int/float keys round-trip like any other
+    result = msgpack.unpackb(
+        data, raw=False, strict_map_key=False, ext_hook=_EXT_HOOKS[readonly]
+    )
 
     # Reconstruct numpy array if present
     if isinstance(result, dict) and result.get("__ndarray"):
         if HAS_NUMPY:
             arr = np.frombuffer(result["data"], dtype=np.dtype(result["dtype"]))
-            return arr.reshape(result["shape"]).copy()
+            return _as_result(arr.reshape(result["shape"]), readonly)
         # Fall back to raw bytes if numpy not available
 
     # Unwrap non-dict type hint wrapper
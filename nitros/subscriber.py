@@ -2,29 +2,49 @@
 
 import asyncio
 import collections
+import functools
 import threading
-from typing import Callable, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
 
 from .compression import decompress
 from .connection import ConnectionManager
 from .discovery import DiscoveryService
 from .logger import _log
 from .serializer import deserialize
+from .transport import _new_event_loop
 
 import nitros.logger as _logger
 
+# Payload decoder per compression mode (low 2 bits of the flags byte)
+_DECODERS = (
+    deserialize,
+    functools.partial(decompress, mode="image"),
+    functools.partial(decompress, mode="pointcloud"),
+    functools.partial(decompress, mode="pointcloud_zstd"),
+)
+
 
 class Subscriber:
     """Subscriber for receiving messages from publishers on a topic."""
 
-    def __init__(self, topic: str, callback: Callable, log: bool = False):
+    def __init__(
+        self,
+        topic: str,
+        callback: Callable,
+        log: bool = False,
+        decode_workers: int = 1,
+    ):
         """
         Initialize subscriber.
 
         Args:
             topic: Topic name to subscribe to
-            callback: Function to call with received messages
+            callback: Function to call with received messages (always called
+                from the same dedicated thread, with the newest decoded frame)
             log: Enable print-based logging
+            decode_workers: Number of frames decoded in parallel. Raise it when
+                decoding (large JPEG/pointcloud frames) can't keep up on one core
         """
         _logger._enabled = _logger._enabled or log
 
@@ -34,9 +54,10 @@ class Subscriber:
         # Event loop for asyncio
         self._loop: Optional[asyncio.AbstractEventLoop] = None
         self._loop_thread: Optional[threading.Thread] = None
+        self._loop_ready = threading.Event()
 
-        # Connection managers (one per discovered publisher)
-        self._connections: Dict[str, ConnectionManager] = {}
+        # Connection managers (one per discovered publisher), keyed by (host, port)
+        self._connections: Dict[Tuple[str, int], ConnectionManager] = {}
         self._connections_lock = threading.Lock()
 
         # Discovery service
@@ -44,9 +65,25 @@ class Subscriber:
 
         self._running = False
 
-        # Callback processing: latest-frame-only queue + dedicated thread
-        self._msg_deque = collections.deque(maxlen=1)
-        self._msg_event = threading.Event()
+        # Callback processing: latest-frame-only queue drained by a
+        # dispatcher task on the event loop (created there in _start_dispatcher)
+        self._msg_queue: Optional[asyncio.Queue] = None
+        self._dispatch_task: Optional[asyncio.Task] = None
+
+        # Decode pool: with several workers frames are decoded in parallel
+        # (JPEG/LZ4/zstd release the GIL; everything does on free-threaded
+        # builds). In-flight frames are bounded by the worker count.
+        self._decode_workers = max(1, decode_workers)
+        self._decode_pool: Optional[ThreadPoolExecutor] = None
+        self._decode_slots: Optional[asyncio.Semaphore] = None
+
+        # Decoded frames go to a latest-only slot read by one callback thread.
+        # A frame finishing after a newer one is dropped, so the callback
+        # never goes back in time.
+        self._result_slot = collections.deque(maxlen=1)
+        self._result_lock = threading.Lock()
+        self._result_event = threading.Event()
+        self._result_seq = 0
         self._callback_thread: Optional[threading.Thread] = None
 
         # Start everything
@@ -56,7 +93,11 @@ class Subscriber:
         """Start subscriber components."""
         self._running = True
 
-        # Start callback processing thread
+        self._decode_pool = ThreadPoolExecutor(
+            max_workers=self._decode_workers, thread_name_prefix="nitros-decode"
+        )
+
+        # Start callback thread
         self._callback_thread = threading.Thread(target=self._callback_worker, daemon=True)
         self._callback_thread.start()
 
@@ -65,8 +106,10 @@ class Subscriber:
         self._loop_thread.start()
 
         # Wait for loop to be ready
-        while self._loop is None:
-            pass
+        self._loop_ready.wait()
+
+        # Start the callback dispatcher on the loop
+        asyncio.run_coroutine_threadsafe(self._start_dispatcher(), self._loop).result()
 
         # Start discovery
         try:
@@ -81,13 +124,14 @@ class Subscriber:
 
     def _run_event_loop(self):
         """Run asyncio event loop in background thread."""
-        self._loop = asyncio.new_event_loop()
+        self._loop = _new_event_loop()
         asyncio.set_event_loop(self._loop)
+        self._loop_ready.set()
         self._loop.run_forever()
 
     def _on_publisher_found(self, host: str, port: int):
         """Callback when a publisher is discovered."""
-        conn_id = f"{host}:{port}"
+        conn_id = (host, port)
 
         with self._connections_lock:
             if conn_id in self._connections:
@@ -104,7 +148,7 @@ class Subscriber:
 
     def _on_publisher_removed(self, host: str, port: int):
         """Callback when a publisher disappears."""
-        conn_id = f"{host}:{port}"
+        conn_id = (host, port)
 
         with self._connections_lock:
             conn = self._connections.pop(conn_id, None)
@@ -113,42 +157,86 @@ class Subscriber:
             asyncio.run_coroutine_threadsafe(conn.stop(), self._loop)
             _log(f"Publisher removed at {host}:{port}")
 
+    async def _start_dispatcher(self):
+        """Create the message queue and dispatcher task (runs on the event loop)."""
+        self._msg_queue = asyncio.Queue(maxsize=1)
+        self._decode_slots = asyncio.Semaphore(self._decode_workers)
+        self._dispatch_task = asyncio.create_task(self._dispatch())
+
+    async def _stop_dispatcher(self):
+        """Cancel the dispatcher task (runs on the event loop)."""
+        if self._dispatch_task:
+            self._dispatch_task.cancel()
+            try:
+                await self._dispatch_task
+            except asyncio.CancelledError:
+                pass
+
+    async def _stop_connections(self, conns: List[ConnectionManager]):
+        """Stop connection managers in parallel (runs on the event loop)."""
+        await asyncio.gather(*(conn.stop() for conn in conns), return_exceptions=True)
+
     def _on_message(self, payload: bytes):
-        """Handle received message - just enqueue, never blocks the receive loop."""
+        """Handle received message (runs on the event loop) - just enqueue, never blocks."""
         if payload:
-            self._msg_deque.append(payload)
-            self._msg_event.set()
+            # Latest frame only: replace whatever is still waiting
+            if self._msg_queue.full():
+                self._msg_queue.get_nowait()
+            self._msg_queue.put_nowait(payload)
+
+    async def _dispatch(self):
+        """Hand the latest payload to the decode pool. Drops stale frames."""
+        loop = asyncio.get_running_loop()
+        seq = 0
+        while True:
+            # Claim a decode slot before taking a frame, so the frame handed
+            # out is the newest one available once a worker is free
+            await self._decode_slots.acquire()
+            try:
+                payload = await self._msg_queue.get()
+            except asyncio.CancelledError:
+                self._decode_slots.release()
+                raise
+
+            seq += 1
+            future = loop.run_in_executor(self._decode_pool, self._decode, seq, payload)
+            future.add_done_callback(lambda _: self._decode_slots.release())
+
+    def _decode(self, seq: int, payload: bytes):
+        """Decode pool job: deserialize and publish to the latest-only result slot."""
+        try:
+            # Zero-copy view past the flags byte (slicing bytes would copy the body)
+            data = memoryview(payload)
+            msg = _DECODERS[data[0] & 0x03](data[1:])
+        except Exception as e:
+            _log(f"Failed to process message: {e}")
+            return
+
+        with self._result_lock:
+            # A newer frame already finished decoding: drop this one
+            if seq < self._result_seq:
+                return
+            self._result_seq = seq
+            self._result_slot.append(msg)  # overwrites any undelivered frame
+        if not self._result_event.is_set():
+            self._result_event.set()
 
     def _callback_worker(self):
-        """Dedicated thread: deserialize + call user callback. Drops stale frames."""
+        """Dedicated thread: call the user callback with the newest decoded frame."""
         while self._running:
-            self._msg_event.wait(timeout=0.1)
-            self._msg_event.clear()
-
-            # Grab latest payload (deque maxlen=1 auto-drops old ones)
             try:
-                payload = self._msg_deque.pop()
+                msg = self._result_slot.pop()
             except IndexError:
+                self._result_event.wait()
+                self._result_event.clear()
                 continue
 
+            if not self._running:
+                break
             try:
-                flags = payload[0]
-                data = payload[1:]
-                compression_mode = flags & 0x03
-
-                if compression_mode == 0:
-                    msg = deserialize(data)
-                elif compression_mode == 1:
-                    msg = decompress(data, "image")
-                elif compression_mode == 2:
-                    msg = decompress(data, "pointcloud")
-                else:
-                    _log(f"Unknown compression mode: {compression_mode}")
-                    continue
-
                 self.callback(msg)
             except Exception as e:
-                _log(f"Failed to process message: {e}")
+                _log(f"Callback error: {e}")
 
     def close(self):
         """Close subscriber and cleanup resources."""
@@ -156,21 +244,34 @@ class Subscriber:
             return
         self._running = False
 
-        # Wake up and stop callback worker
-        self._msg_event.set()
-        if self._callback_thread:
+        # Stop callback dispatcher and decode pool
+        if self._loop:
+            future = asyncio.run_coroutine_threadsafe(self._stop_dispatcher(), self._loop)
+            try:
+                future.result(timeout=1.0)
+            except:
+                pass
+
+        # Wake up and stop callback thread (no callbacks after close returns,
+        # unless one is still running past the timeout)
+        self._result_event.set()
+        if self._callback_thread and self._callback_thread is not threading.current_thread():
             self._callback_thread.join(timeout=1.0)
 
-        # Stop all connections
-        if self._loop:
-            for conn in self._connections.values():
-                future = asyncio.run_coroutine_threadsafe(conn.stop(), self._loop)
-                try:
-                    future.result(timeout=1.0)
-                except:
-                    pass
-
-        self._connections.clear()
+        if self._decode_pool:
+            self._decode_pool.shutdown(wait=False)
+
+        # Stop all connections concurrently (one shared timeout, not one each)
+        with self._connections_lock:
+            conns = list(self._connections.values())
+            self._connections.clear()
+
+        if self._loop and conns:
+            future = asyncio.run_coroutine_threadsafe(self._stop_connections(conns), self._loop)
+            try:
+                future.result(timeout=1.0)
+            except:
+                pass
 
         # Close discovery
         if self.discovery:
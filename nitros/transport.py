@@ -1,28 +1,71 @@
 """Transport module for NitROS - TCP server and client with asyncio."""
 
 import asyncio
+import socket
 import struct
-from typing import Callable, List, Optional
+from typing import Callable, List, Optional, Sequence, Set
 
 from .logger import _log
 
+# Optional imports
+try:
+    import uvloop
+    HAS_UVLOOP = True
+except ImportError:
+    HAS_UVLOOP = False
+
+# Message length prefix: [4 bytes big-endian length][payload]
+_LEN_STRUCT = struct.Struct('>I')
+
+# Client staging buffer: small messages are received and parsed here in
+# batches; larger frames are received straight into their own buffer
+STAGING_BUFFER_SIZE = 64 * 1024  # 64KB
+
+# Largest message a client accepts. A frame's buffer is allocated as soon as
+# its length prefix arrives, so a bogus prefix from an untrusted peer must
+# not be able to claim gigabytes; the connection is dropped instead.
+MAX_MESSAGE_SIZE = 256 * 1024 * 1024  # 256MB
 
-class TCPServer:
-    """TCP server that accepts connections and broadcasts messages to all clients."""
 
-    def __init__(self, host: str = "0.0.0.0", port: int = 0):
+def _new_event_loop() -> asyncio.AbstractEventLoop:
+    """Create an event loop for a background thread (libuv-based uvloop when installed)."""
+    if HAS_UVLOOP:
+        return uvloop.new_event_loop()
+    return asyncio.new_event_loop()
+
+
+class TCPServer:
+    """
+    TCP server that accepts connections and broadcasts messages to all clients.
+
+    Not thread-safe: every method must run on the event loop that called
+    start(). The client list is only touched from that loop, between
+    awaits, so it needs no lock.
+    """
+
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = 0,
+        nodelay: Optional[bool] = True,
+        sndbuf: Optional[int] = None,
+    ):
         """
         Initialize TCP server.
 
         Args:
             host: Host to bind to (default: 0.0.0.0)
             port: Port to bind to (0 = random available port)
+            nodelay: Set TCP_NODELAY on client sockets (None = leave the OS default)
+            sndbuf: SO_SNDBUF size in bytes for client sockets (None = leave the
+                kernel's autotuning on; a fixed size turns it off)
         """
         self.host = host
         self.port = port
+        self.nodelay = nodelay
+        self.sndbuf = sndbuf
         self.server: Optional[asyncio.Server] = None
-        self.clients: List[asyncio.StreamWriter] = []
-        self._lock = asyncio.Lock()
+        self.clients: Set[asyncio.StreamWriter] = set()
         self._running = False
         self.HIGH_WATER_MARK = 4 * 1024 * 1024  # 4MB - skip client if buffer exceeds this
 
@@ -50,75 +93,101 @@ class TCPServer:
         addr = writer.get_extra_info('peername')
         _log(f"Client connected: {addr}")
 
-        async with self._lock:
-            self.clients.append(writer)
+        sock = writer.get_extra_info('socket')
+        if sock is not None:
+            try:
+                if self.nodelay is not None:
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, int(self.nodelay))
+                if self.sndbuf is not None:
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.sndbuf)
+            except OSError as e:
+                _log(f"Failed to set socket options for {addr}: {e}")
+
+        self.clients.add(writer)
 
         try:
-            # Wait for client disconnect (read returns empty on EOF)
-            while self._running:
-                data = await reader.read(1024)
-                if not data:
-                    break
+            # Wait for client disconnect. Subscribers never send anything;
+            # whatever a peer does send is discarded rather than buffered
+            while await reader.read(65536):
+                pass
         except Exception:
             pass
         finally:
-            async with self._lock:
-                if writer in self.clients:
-                    self.clients.remove(writer)
+            self.clients.discard(writer)
             try:
                 writer.close()
                 await writer.wait_closed()
             except:
                 pass
 
-    async def broadcast(self, data: bytes):
+    async def broadcast(self, chunks: Sequence[bytes]):
         """
         Broadcast message to all connected clients (fire-and-forget).
         Skips clients whose write buffer is full (per-client adaptive FPS).
 
         Args:
-            data: Message payload to send
+            chunks: Message payload as a sequence of byte buffers, written
+                back to back without being concatenated first
+        """
+        await self.broadcast_many((chunks,))
+
+    async def broadcast_many(self, messages: Sequence[Sequence[bytes]]):
+        """
+        Broadcast several messages to all connected clients in one pass.
+
+        Each client gets a single writelines() call covering every message,
+        so a burst of small messages costs one buffer write per client.
+
+        Args:
+            messages: Messages to send, each a sequence of payload chunks
         """
         if not self.clients:
             return
 
-        # Length-prefixed message: [4 bytes length][payload]
-        length = struct.pack('>I', len(data))
-        message = length + data
-
-        async with self._lock:
-            disconnected = []
-            for writer in self.clients:
-                try:
-                    # Check if transport buffer is backed up
-                    transport = writer.transport
-                    buf_size = transport.get_write_buffer_size()
-                    if buf_size > self.HIGH_WATER_MARK:
-                        continue  # skip this client, it can't keep up
-
-                    writer.write(message)  # non-blocking buffer write
-                except Exception:
-                    disconnected.append(writer)
-
-            for writer in disconnected:
-                self.clients.remove(writer)
-                try:
-                    writer.close()
-                except:
-                    pass
+        # Length-prefixed messages: [4 bytes length][payload chunks...] ...
+        # Each prefix is a fresh bytes object on purpose: transports that
+        # can't send everything at once keep references to the buffers
+        # (not copies), so a reused bytearray would be overwritten by the
+        # next message while the previous one is still queued.
+        buffers: List[bytes] = []
+        for chunks in messages:
+            buffers.append(_LEN_STRUCT.pack(sum(len(chunk) for chunk in chunks)))
+            buffers.extend(chunks)
+
+        # Skip clients whose transport buffer is backed up (they can't keep up)
+        high_water = self.HIGH_WATER_MARK
+        fast_writers = [
+            writer for writer in self.clients
+            if writer.transport.get_write_buffer_size() <= high_water
+        ]
+
+        disconnected = []
+        for writer in fast_writers:
+            try:
+                # Non-blocking; prefixes and chunks are queued without
+                # being joined into one buffer first
+                writer.transport.writelines(buffers)
+            except Exception:
+                disconnected.append(writer)
+
+        for writer in disconnected:
+            self.clients.discard(writer)
+            try:
+                writer.close()
+            except:
+                pass
 
     async def stop(self):
         """Stop the TCP server and close all connections."""
         self._running = False
 
         # Close all client connections first (unblocks _handle_client reads)
-        async with self._lock:
-            for writer in self.clients:
-                try:
-                    writer.close()
-                except:
-                    pass
-            self.clients.clear()
+        for writer in self.clients:
+            try:
+                writer.close()
+            except:
+                pass
+        self.clients.clear()
 
         if self.server:
             self.server.close()
@@ -127,35 +196,51 @@ class TCPServer:
         _log("TCP server stopped")
 
 
-class TCPClient:
-    """TCP client that connects to a server and receives messages."""
+class TCPClient(asyncio.BufferedProtocol):
+    """
+    TCP client that connects to a server and receives messages.
+
+    The socket is read straight into our own buffers (recv_into): a
+    reused staging buffer for headers and small messages, and a new
+    bytearray per large frame that is handed to the callback as-is.
+    """
 
-    def __init__(self, host: str, port: int):
+    def __init__(self, host: str, port: int, rcvbuf: Optional[int] = None):
         """
         Initialize TCP client.
 
         Args:
             host: Server host
             port: Server port
+            rcvbuf: SO_RCVBUF size in bytes (None = leave the kernel's autotuning
+                on). Applied after connecting, so it can't raise the TCP window scale
         """
         self.host = host
         self.port = port
-        self.reader: Optional[asyncio.StreamReader] = None
-        self.writer: Optional[asyncio.StreamWriter] = None
+        self.rcvbuf = rcvbuf
+        self.transport: Optional[asyncio.Transport] = None
         self._callback: Optional[Callable[[bytes], None]] = None
+        self._disconnect_callback: Optional[Callable[[], None]] = None
         self._running = False
-        self._receive_task: Optional[asyncio.Task] = None
+        self._closed: Optional[asyncio.Future] = None
+
+        # Staging buffer: [0:_staged] holds received bytes not yet parsed
+        self._staging = bytearray(STAGING_BUFFER_SIZE)
+        self._staging_view = memoryview(self._staging)
+        self._staged = 0
+
+        # Large frame being received directly (None while staging)
+        self._frame: Optional[bytearray] = None
+        self._frame_view: Optional[memoryview] = None
+        self._frame_pos = 0
 
     async def connect(self):
         """Connect to the server."""
-        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
-        self._running = True
+        loop = asyncio.get_running_loop()
+        self._closed = loop.create_future()
+        await loop.create_connection(lambda: self, self.host, self.port)
         _log(f"Connected to {self.host}:{self.port}")
 
-        # Start receive loop
-        if self._callback:
-            self._receive_task = asyncio.create_task(self._receive_loop())
-
     def on_message(self, callback: Callable[[bytes], None]):
         """
         Register callback for incoming messages.
@@ -165,45 +250,113 @@ class TCPClient:
         """
         self._callback = callback
 
-    async def _receive_loop(self):
-        """Receive messages from server."""
-        try:
-            while self._running:
-                # Read length prefix (4 bytes)
-                length_data = await self.reader.readexactly(4)
-                length = struct.unpack('>I', length_data)[0]
-
-                # Read payload
-                payload = await self.reader.readexactly(length)
-
-                # Call callback
-                if self._callback:
-                    try:
-                        self._callback(payload)
-                    except Exception as e:
-                        _log(f"Callback error: {e}")
-        except asyncio.IncompleteReadError:
-            pass
-        except Exception:
-            pass
-        finally:
-            self._running = False
+    def on_disconnect(self, callback: Callable[[], None]):
+        """
+        Register callback for when the connection is lost or closed.
+
+        Args:
+            callback: Function to call (no arguments) once the connection ends
+        """
+        self._disconnect_callback = callback
+
+    def connection_made(self, transport: asyncio.Transport):
+        """asyncio.Protocol: connection established."""
+        self.transport = transport
+        self._running = True
+
+        sock = transport.get_extra_info('socket')
+        if sock is not None and self.rcvbuf is not None:
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.rcvbuf)
+            except OSError as e:
+                _log(f"Failed to set socket options for {self.host}:{self.port}: {e}")
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        """asyncio.BufferedProtocol: where the next recv_into() writes."""
+        if self._frame is not None:
+            return self._frame_view[self._frame_pos:]
+        return self._staging_view[self._staged:]
+
+    def buffer_updated(self, nbytes: int):
+        """asyncio.BufferedProtocol: `nbytes` were written into the last get_buffer()."""
+        if self._frame is None:
+            self._staged += nbytes
+            self._parse_staging()
+            return
+
+        self._frame_pos += nbytes
+        if self._frame_pos == len(self._frame):
+            frame = self._frame
+            self._frame_view.release()
+            self._frame = self._frame_view = None
+            self._deliver(frame)
+
+    def _parse_staging(self):
+        """Emit every complete [4 bytes length][payload] message in the staging buffer."""
+        buf = self._staging
+        staged = self._staged
+        offset = 0
+        while staged - offset >= 4:
+            length = _LEN_STRUCT.unpack_from(buf, offset)[0]
+            if length > MAX_MESSAGE_SIZE:
+                _log(
+                    f"Message of {length} bytes from {self.host}:{self.port} exceeds "
+                    f"{MAX_MESSAGE_SIZE} bytes, closing connection"
+                )
+                self._staged = 0
+                self.transport.close()
+                return
+            start = offset + 4
+            end = start + length
+            if end > staged:
+                # Too big for staging: move what we have into the frame's own
+                # buffer and receive the rest of it there directly
+                if end - offset > len(buf):
+                    frame = bytearray(length)
+                    self._frame_pos = staged - start
+                    frame[:self._frame_pos] = self._staging_view[start:staged]
+                    self._frame = frame
+                    self._frame_view = memoryview(frame)
+                    offset = staged
+                break
+
+            # Slicing copies, so the payload stays valid after the staging
+            # buffer is reused (callbacks may hand it to another thread)
+            self._deliver(buf[start:end])
+            offset = end
+
+        # Move the incomplete tail to the front (memoryview copy handles overlap)
+        remaining = staged - offset
+        if offset and remaining:
+            self._staging_view[:remaining] = self._staging_view[offset:staged]
+        self._staged = remaining
+
+    def _deliver(self, payload: bytearray):
+        """Pass one complete message to the callback."""
+        if self._callback:
+            try:
+                self._callback(payload)
+            except Exception as e:
+                _log(f"Callback error: {e}")
+
+    def connection_lost(self, exc: Optional[Exception]):
+        """asyncio.Protocol: connection closed by either side."""
+        self._running = False
+        self._frame = self._frame_view = None
+        self._staged = 0
+        if self._closed is not None and not self._closed.done():
+            self._closed.set_result(None)
+        if self._disconnect_callback:
+            self._disconnect_callback()
 
     async def stop(self):
         """Stop the client and close connection."""
         self._running = False
 
-        if self._receive_task:
-            self._receive_task.cancel()
-            try:
-                await self._receive_task
-            except asyncio.CancelledError:
-                pass
-
-        if self.writer:
+        if self.transport:
             try:
-                self.writer.close()
-                await self.writer.wait_closed()
+                self.transport.close()
+                await self._closed
             except:
                 pass
 